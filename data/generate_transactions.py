@@ -2,18 +2,28 @@
 """Generate a synthetic retail transactions dataset for market basket analysis.
 
 The generator creates realistic co-purchase behavior (e.g., laptops → mouse/keyboard/bag),
-optionally across multiple stores and days. Output is a tidy CSV with one row per line item.
+optionally across multiple stores and days. Output is a tidy Parquet (or CSV) file with one row
+per line item.
 
 Columns: order_id, customer_id, date, store, item, category, price, quantity
+
+With ``--out_format basket`` the order x item incidence matrix is written instead, as a
+sparse ``.npz`` (row i is order_id i+1) plus an ``.items.json`` sidecar of column names.
 """
 from __future__ import annotations
 import argparse
-import random
-from datetime import datetime, timedelta
+import json
+from datetime import datetime
 from pathlib import Path
-from typing import List
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
+
+try:  # optional: vectorized CSV writer
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
 
 RANDOM_CATEGORIES = {
     # anchor : (co-purchase items, base price)
@@ -46,70 +56,88 @@ ALL_ITEMS = {**{k: v for k, (_, v) in RANDOM_CATEGORIES.items()}, **EXTRA_ITEMS}
 STORES = ["Downtown", "Mall", "Airport", "Online"]
 
 
-def sample_basket(rng: random.Random) -> List[str]:
-    """Sample a basket with anchor products + probabilistic accessories."""
-    anchor = rng.choice(list(RANDOM_CATEGORIES.keys()))
-    co_items, _ = RANDOM_CATEGORIES[anchor]
-    basket = {anchor}
+ITEMS = sorted(ALL_ITEMS)
+ITEM_INDEX = {item: i for i, item in enumerate(ITEMS)}
+ANCHORS = list(RANDOM_CATEGORIES)
+MULTI_QTY_ITEMS = {"Printer Paper", "Ink Cartridge"}
 
-    # Anchor attachment probabilities
-    for item in co_items:
-        p = 0.65 if anchor == "Laptop" and item in {"Mouse", "Keyboard", "Laptop Bag"} else 0.35
-        if rng.random() < p:
-            basket.add(item)
 
-    # Random extras with small probability
-    for item in EXTRA_ITEMS:
-        if rng.random() < 0.05:
-            basket.add(item)
-
-    return sorted(basket)
+def attachment_probabilities() -> np.ndarray:
+    """Matrix P[anchor, item]: chance that `item` is in a basket built around `anchor`."""
+    P = np.zeros((len(ANCHORS), len(ITEMS)))
+    extras = [ITEM_INDEX[item] for item in EXTRA_ITEMS]
+    for a, anchor in enumerate(ANCHORS):
+        co_items, _ = RANDOM_CATEGORIES[anchor]
+        # Random extras with small probability
+        P[a, extras] = 0.05
+        # Anchor attachment probabilities (drawn independently of the extras)
+        for item in co_items:
+            p = 0.65 if anchor == "Laptop" and item in {"Mouse", "Keyboard", "Laptop Bag"} else 0.35
+            P[a, ITEM_INDEX[item]] = 1 - (1 - p) * (1 - 0.05)
+        P[a, ITEM_INDEX[anchor]] = 1.0
+    return P
 
 
 def generate(start: str, end: str, n_customers: int, avg_orders_per_day: float, seed: int) -> pd.DataFrame:
-    rng = random.Random(seed)
-    np.random.seed(seed)
+    rng = np.random.default_rng(seed)
 
     start_dt = datetime.fromisoformat(start)
     end_dt = datetime.fromisoformat(end)
     days = (end_dt - start_dt).days + 1
-
-    rows = []
-    order_id = 1
-    for d in range(days):
-        date = (start_dt + timedelta(days=d)).date().isoformat()
-        # Poisson-like orders per day
-        n_orders = max(1, int(np.random.poisson(avg_orders_per_day)))
-        for _ in range(n_orders):
-            customer_id = rng.randint(1, n_customers)
-            store = rng.choice(STORES)
-            basket = sample_basket(rng)
-            for item in basket:
-                price = ALL_ITEMS[item] * np.random.uniform(0.9, 1.1)
-                qty = 1 if item not in {"Printer Paper", "Ink Cartridge"} else rng.choice([1, 2, 3])
-                rows.append({
-                    "order_id": order_id,
-                    "customer_id": customer_id,
-                    "date": date,
-                    "store": store,
-                    "item": item,
-                    "category": "Electronics" if item in ALL_ITEMS else "Misc",
-                    "price": round(float(price), 2),
-                    "quantity": int(qty),
-                })
-            order_id += 1
-
-    return pd.DataFrame(rows)
+    dates = pd.date_range(start_dt, periods=days, freq="D").strftime("%Y-%m-%d").to_numpy()
+
+    # Poisson-like orders per day, then per-order attributes in bulk
+    n_orders = np.maximum(rng.poisson(avg_orders_per_day, size=days), 1)
+    n_total = int(n_orders.sum())
+    # Low-cardinality columns are drawn as integer codes and only become
+    # categoricals at the end, so no per-row strings are ever built
+    date_codes = np.repeat(np.arange(days, dtype=np.int32), n_orders)
+    customer_id = rng.integers(1, n_customers + 1, size=n_total)
+    store_codes = rng.integers(0, len(STORES), size=n_total, dtype=np.int8)
+
+    # Sample every basket at once: anchor product + probabilistic accessories
+    anchors = rng.integers(len(ANCHORS), size=n_total)
+    present = rng.random((n_total, len(ITEMS))) < attachment_probabilities()[anchors]
+    order_idx, item_idx = np.nonzero(present)
+
+    base = np.array([ALL_ITEMS[item] for item in ITEMS], dtype=float)
+    prices = base[item_idx] * rng.uniform(0.9, 1.1, size=item_idx.size)
+    np.round(prices, 2, out=prices)
+    multi_qty = np.isin(ITEMS, list(MULTI_QTY_ITEMS))[item_idx]
+    qty = np.where(multi_qty, rng.integers(1, 4, size=item_idx.size, dtype=np.int32), np.int32(1))
+
+    return pd.DataFrame({
+        "order_id": order_idx + 1,
+        "customer_id": customer_id[order_idx],
+        "date": pd.Categorical.from_codes(date_codes[order_idx], categories=dates),
+        "store": pd.Categorical.from_codes(store_codes[order_idx], categories=STORES),
+        "item": pd.Categorical.from_codes(item_idx, categories=ITEMS),
+        "category": pd.Categorical.from_codes(np.zeros(item_idx.size, dtype=np.int8), categories=["Electronics"]),
+        "price": prices,
+        "quantity": qty,
+    })
+
+
+def to_basket(df: pd.DataFrame) -> sp.csr_matrix:
+    """Boolean order x item CSR matrix; columns follow ITEMS, row i is order_id i+1."""
+    order_idx = df["order_id"].to_numpy() - 1
+    item_idx = pd.Categorical(df["item"], categories=ITEMS).codes
+    return sp.csr_matrix(
+        (np.ones(len(df), dtype=bool), (order_idx, item_idx)),
+        shape=(int(order_idx.max()) + 1, len(ITEMS)),
+    )
 
 
 def parse_args() -> argparse.Namespace:
-    p = argparse.ArgumentParser(description="Generate synthetic transactions CSV")
+    p = argparse.ArgumentParser(description="Generate synthetic transactions Parquet/CSV")
     p.add_argument("--start", default="2024-01-01", help="start date YYYY-MM-DD")
     p.add_argument("--end", default="2024-12-31", help="end date YYYY-MM-DD")
     p.add_argument("--customers", type=int, default=800)
     p.add_argument("--avg_per_day", type=float, default=120.0, help="avg orders per day")
     p.add_argument("--seed", type=int, default=42)
-    p.add_argument("--out", default="data/transactions.csv")
+    p.add_argument("--out", default="data/transactions.parquet", help=".parquet or .csv")
+    p.add_argument("--out_format", choices=["tidy", "basket"], default="tidy",
+                   help="tidy line items, or the sparse order x item matrix (.npz)")
     return p.parse_args()
 
 
@@ -118,7 +146,19 @@ def main() -> None:
     df = generate(args.start, args.end, args.customers, args.avg_per_day, args.seed)
     out_path = Path(args.out)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(out_path, index=False)
+    if args.out_format == "basket":
+        M = to_basket(df)
+        out_path = out_path.with_suffix(".npz")
+        sp.save_npz(out_path, M)
+        out_path.with_suffix(".items.json").write_text(json.dumps({"items": ITEMS}, indent=2), encoding="utf-8")
+        print(f"Saved {M.shape[0]:,} x {M.shape[1]} basket matrix → {out_path}")
+        return
+    if out_path.suffix == ".parquet":
+        df.to_parquet(out_path, engine="pyarrow", compression="zstd", index=False)
+    elif pa is not None:
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), out_path)
+    else:
+        df.to_csv(out_path, index=False)
     print(f"Saved {len(df):,} rows → {out_path}")
 
 
@@ -0,0 +1,176 @@
+# src/fast_apriori.py
+"""Vectorized Apriori for one-hot encoded baskets.
+
+Drop-in for ``mlxtend.frequent_patterns.apriori``: same arguments, same
+``support``/``itemsets`` output. Each item's transaction column is packed
+into ``uint64`` words (64 orders per word), so the support of a candidate is
+the popcount of the AND of its items' bitsets, and every candidate of a level
+is counted in one vectorized pass, split across ``n_jobs`` threads.
+"""
+from __future__ import annotations
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Iterator
+import numpy as np
+import pandas as pd
+
+try:  # optional: fused, multi-core support counting
+    import numba
+except ImportError:
+    numba = None
+
+# Upper bound on uint64 words of the (candidates x words) temporary when low_memory=True
+_BLOCK_WORDS = 1 << 23
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def _swar_popcount(x: np.ndarray) -> np.ndarray:
+    x = x - ((x >> np.uint64(1)) & _M1)
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return (x * _H01) >> np.uint64(56)
+
+
+# np.bitwise_count needs NumPy >= 2.0
+_popcount = getattr(np, "bitwise_count", _swar_popcount)
+
+
+def pack_bits(X: np.ndarray) -> np.ndarray:
+    """Pack a dense boolean (orders x items) matrix into (items x ceil(orders/64)) uint64 bitsets."""
+    packed = np.packbits(X, axis=0, bitorder="little")  # (ceil(orders/8), items) bytes
+    out = np.zeros((X.shape[1], -(-packed.shape[0] // 8) * 8), dtype=np.uint8)
+    out[:, :packed.shape[0]] = packed.T
+    return out.view(np.uint64)
+
+
+def _set_bits(word_row: np.ndarray, rows: np.ndarray) -> None:
+    rows = rows.astype(np.int64, copy=False)
+    np.bitwise_or.at(word_row, rows >> 6, np.uint64(1) << (rows & 63).astype(np.uint64))
+
+
+def _to_bits(df: pd.DataFrame) -> np.ndarray:
+    # Sparse baskets are never densified: each column's stored row positions
+    # are OR-ed into its bitset, so memory is the bitsets plus one column
+    if len(df.columns) and all(isinstance(t, pd.SparseDtype) for t in df.dtypes):
+        bits = np.zeros((df.shape[1], -(-len(df.index) // 64)), dtype=np.uint64)
+        for j, word_row in enumerate(bits):
+            arr = df.iloc[:, j].array
+            if arr.fill_value:  # True-filled column: only its gaps are stored
+                rows = np.flatnonzero(np.asarray(arr, dtype=bool))
+            else:
+                rows = arr.sp_index.indices[arr.sp_values.astype(bool)]
+            _set_bits(word_row, rows)
+        return bits
+    # Genuinely dense input: Fortran order makes each item's column contiguous,
+    # which is the axis packbits walks
+    return pack_bits(np.asarray(df.values, dtype=bool, order="F"))
+
+
+def generate_new_combinations(old_combinations: np.ndarray) -> Iterator[tuple[int, ...]]:
+    """Yield (k+1)-candidates from lexicographically sorted frequent k-itemsets.
+
+    Two itemsets are joined when they share their first k-1 items; a candidate
+    is dropped if any of its k-subsets is not frequent (downward closure).
+    """
+    frequent = set(map(tuple, old_combinations))
+    n = len(old_combinations)
+    for i in range(n):
+        head = tuple(old_combinations[i])
+        for j in range(i + 1, n):
+            other = tuple(old_combinations[j])
+            if head[:-1] != other[:-1]:
+                break
+            cand = head + (other[-1],)
+            if all(cand[:m] + cand[m + 1:] in frequent for m in range(len(cand) - 2)):
+                yield cand
+
+
+def _count(bits: np.ndarray, combin: np.ndarray) -> np.ndarray:
+    acc = bits[combin[:, 0]]
+    for j in range(1, combin.shape[1]):
+        acc &= bits[combin[:, j]]
+    return _popcount(acc).sum(axis=1)
+
+
+if numba is not None:
+    _popcount64 = numba.njit(inline="always", cache=True)(_swar_popcount)
+
+    @numba.njit(parallel=True, cache=True)
+    def _count_numba(bits: np.ndarray, combin: np.ndarray, out: np.ndarray) -> None:
+        # AND + popcount word by word: no per-candidate temporaries
+        for c in numba.prange(combin.shape[0]):
+            s = 0
+            for w in range(bits.shape[1]):
+                acc = bits[combin[c, 0], w]
+                for j in range(1, combin.shape[1]):
+                    acc &= bits[combin[c, j], w]
+                s += np.int64(_popcount64(acc))
+            out[c] = s
+
+
+def _supports(
+    bits: np.ndarray, combin: np.ndarray, n_orders: int, low_memory: bool, n_jobs: int,
+) -> np.ndarray:
+    if numba is not None:
+        numba.set_num_threads(min(n_jobs, numba.config.NUMBA_NUM_THREADS))
+        out = np.empty(len(combin), dtype=np.int64)
+        _count_numba(bits, combin, out)
+        return out / n_orders
+    # NumPy releases the GIL in the AND/popcount ufuncs, so threads share `bits`
+    step = -(-len(combin) // n_jobs)
+    if low_memory:
+        step = min(step, max(1, _BLOCK_WORDS // (bits.shape[1] * n_jobs)))
+    blocks = [combin[s:s + step] for s in range(0, len(combin), step)]
+    if n_jobs > 1 and len(blocks) > 1:
+        with ThreadPoolExecutor(n_jobs) as ex:
+            counts = list(ex.map(partial(_count, bits), blocks))
+    else:
+        counts = [_count(bits, b) for b in blocks]
+    return np.concatenate(counts) / n_orders
+
+
+def apriori(
+    df: pd.DataFrame,
+    min_support: float = 0.5,
+    use_colnames: bool = False,
+    max_len: int | None = None,
+    low_memory: bool = False,
+    n_jobs: int | None = None,
+) -> pd.DataFrame:
+    if min_support <= 0.0 or min_support > 1.0:
+        raise ValueError(f"min_support must be in (0, 1], got {min_support}")
+    if n_jobs is None or n_jobs < 1:  # joblib-style: None, 0 or -1 mean all cores
+        n_jobs = os.cpu_count() or 1
+
+    n_orders = len(df.index)
+    bits = _to_bits(df)
+    support = _popcount(bits).sum(axis=1) / n_orders
+    keep = np.flatnonzero(support >= min_support)
+    itemsets = {1: keep.reshape(-1, 1)}
+    supports = {1: support[keep]}
+
+    k = 1
+    while itemsets[k].size and (max_len is None or k < max_len):
+        combin = np.array(list(generate_new_combinations(itemsets[k])), dtype=np.intp)
+        if combin.size == 0:
+            break
+        sup = _supports(bits, combin, n_orders, low_memory, n_jobs)
+        mask = sup >= min_support
+        if not mask.any():
+            break
+        itemsets[k + 1] = combin[mask]
+        supports[k + 1] = sup[mask]
+        k += 1
+
+    labels = list(df.columns) if use_colnames else list(range(bits.shape[0]))
+    rows = [
+        (s, frozenset(labels[i] for i in c))
+        for level in sorted(itemsets)
+        for s, c in zip(supports[level], itemsets[level])
+    ]
+    return pd.DataFrame(rows, columns=["support", "itemsets"])
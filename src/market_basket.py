@@ -3,7 +3,7 @@
 
 Steps
 -----
-1) Load transactions CSV (one row per line-item)
+1) Load transactions Parquet/CSV (one row per line-item)
 2) Transform to transaction x item one-hot matrix (binary incidence)
 3) Mine frequent itemsets via Apriori or FP-Growth (mlxtend)
 4) Derive association rules (confidence, lift, leverage)
@@ -12,31 +12,114 @@ Steps
 Example
 -------
 python src/market_basket.py \
-  --input data/transactions.csv --outdir outputs \
-  --min_support 0.02 --metric lift --min_threshold 1.1 --algo apriori
+  --input data/transactions.parquet --outdir outputs \
+  --min_support 0.02 --metric lift --min_threshold 1.1 --algo fpgrowth
 """
 from __future__ import annotations
 import argparse
+import hashlib
+import json
+import os
+import zipfile
+from functools import lru_cache
+from itertools import combinations
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from mlxtend.frequent_patterns import apriori, fpgrowth, association_rules
+import scipy.sparse as sp
+from mlxtend.frequent_patterns import fpgrowth
+from fast_apriori import apriori
 from utils import ensure_outdir, save_table, save_json, plot_top_items
 
 
-def load_and_prepare(path: str | Path) -> pd.DataFrame:
-    df = pd.read_csv(path)
-    # Build a basket-level indicator matrix (order_id x item)
-    basket = (
-        df.assign(qty=lambda d: (d["quantity"] > 0).astype(int))
-          .pivot_table(index="order_id", columns="item", values="qty", aggfunc="max", fill_value=0)
-          .astype(bool)
+def _cache_paths(path: Path, cache_dir: Path) -> tuple[Path, Path]:
+    # "<path key>-<mtime key>": regenerating the input invalidates the entry,
+    # and the shared path prefix lets the stale entry be evicted
+    resolved = str(path.resolve())
+    prefix = hashlib.sha1(resolved.encode()).hexdigest()[:16]
+    key = hashlib.sha1(f"{resolved}:{os.path.getmtime(path)}".encode()).hexdigest()[:16]
+    return cache_dir / f"{prefix}-{key}.npz", cache_dir / f"{prefix}-{key}.labels.npz"
+
+
+def _load_cached(matrix_path: Path, labels_path: Path) -> pd.DataFrame | None:
+    if not (matrix_path.exists() and labels_path.exists()):
+        return None
+    try:
+        M = sp.load_npz(matrix_path)
+        with np.load(labels_path) as labels:
+            return pd.DataFrame.sparse.from_spmatrix(M, index=labels["orders"], columns=labels["items"])
+    except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile):
+        return None  # truncated or corrupt entry: rebuild and overwrite it
+
+
+def _save_cached(
+    M: sp.csr_matrix, orders: pd.Index, items: pd.Index, matrix_path: Path, labels_path: Path,
+) -> None:
+    cache_dir = matrix_path.parent
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Write under temp names and rename into place, matrix last, so an
+    # interrupted run never leaves a half-written entry behind
+    tmp_labels = labels_path.with_name(f"{labels_path.name}.{os.getpid()}.tmp")
+    tmp_matrix = matrix_path.with_name(f"{matrix_path.name}.{os.getpid()}.tmp")
+    with open(tmp_labels, "wb") as f:
+        # Plain int/str arrays, so the labels load back without pickle
+        np.savez(f, orders=np.asarray(orders.tolist()), items=np.asarray(items.tolist()))
+    with open(tmp_matrix, "wb") as f:
+        sp.save_npz(f, M)
+    os.replace(tmp_labels, labels_path)
+    os.replace(tmp_matrix, matrix_path)
+    # Evict entries for earlier versions of the same input
+    prefix = matrix_path.name.split("-", 1)[0]
+    for stale in cache_dir.glob(f"{prefix}-*.npz"):
+        if stale not in (matrix_path, labels_path):
+            stale.unlink(missing_ok=True)
+
+
+def load_and_prepare(path: str | Path, cache_dir: str | Path | None = None) -> pd.DataFrame:
+    path = Path(path)
+    if path.suffix == ".npz":
+        # Basket matrix straight from generate_transactions.py --out_format basket
+        M = sp.load_npz(path).tocsr().astype(bool)
+        items = json.loads(path.with_suffix(".items.json").read_text(encoding="utf-8"))["items"]
+        orders = pd.RangeIndex(1, M.shape[0] + 1)
+        return pd.DataFrame.sparse.from_spmatrix(M, index=orders, columns=items)
+
+    if cache_dir is not None:
+        matrix_path, labels_path = _cache_paths(path, Path(cache_dir))
+        cached = _load_cached(matrix_path, labels_path)
+        if cached is not None:
+            return cached
+
+    cols = ["order_id", "item", "quantity"]
+    df = pd.read_parquet(path, columns=cols) if path.suffix == ".parquet" else pd.read_csv(path, usecols=cols)
+    # Blank order_id/item cells would get code -1; drop them like pivot_table
+    # did, before coding, so orders left with no items disappear as well
+    df = df[df["order_id"].notna() & df["item"].notna()]
+    # Build a basket-level indicator matrix (order_id x item) straight from
+    # integer codes, so memory scales with line-items rather than orders*items
+    oi, orders = pd.factorize(df["order_id"], sort=True)
+    # Item ids come from categorical codes (contiguous ints), so a column that
+    # is already categorical is used as-is with no per-row string hashing
+    item = df["item"].astype("category").cat.remove_unused_categories()
+    ii, items = item.cat.codes.to_numpy(), item.cat.categories
+    mask = (df["quantity"] > 0).to_numpy() & (oi >= 0) & (ii >= 0)
+    M = sp.csr_matrix(
+        (np.ones(mask.sum(), dtype=bool), (oi[mask], ii[mask])),
+        shape=(len(orders), len(items)),
     )
+
+    if cache_dir is not None:
+        _save_cached(M, orders, items, matrix_path, labels_path)
+
+    basket = pd.DataFrame.sparse.from_spmatrix(M, index=orders, columns=items)
     return basket
 
 
-def mine_frequent_itemsets(basket: pd.DataFrame, algo: str, min_support: float) -> pd.DataFrame:
+def mine_frequent_itemsets(
+    basket: pd.DataFrame, algo: str, min_support: float, n_jobs: int | None = None,
+) -> pd.DataFrame:
     if algo == "apriori":
-        fi = apriori(basket, min_support=min_support, use_colnames=True)
+        fi = apriori(basket, min_support=min_support, use_colnames=True, low_memory=True, n_jobs=n_jobs)
     elif algo == "fpgrowth":
         fi = fpgrowth(basket, min_support=min_support, use_colnames=True)
     else:
@@ -45,47 +128,100 @@ def mine_frequent_itemsets(basket: pd.DataFrame, algo: str, min_support: float)
     return fi
 
 
+@lru_cache(maxsize=None)
+def _fmt(items: frozenset) -> str:
+    # Many rules share an antecedent/consequent, so each set is formatted once
+    return ", ".join(sorted(items))
+
+
 def derive_rules(fi: pd.DataFrame, metric: str, min_threshold: float) -> pd.DataFrame:
-    rules = association_rules(fi, metric=metric, min_threshold=min_threshold)
+    # Every split X -> Y of a frequent itemset; X and Y are frequent too
+    # (downward closure), so all supports are plain dict lookups
+    sup = dict(zip(fi["itemsets"], fi["support"]))
+    splits = [
+        (frozenset(ante), itemset.difference(ante))
+        for itemset in sup if len(itemset) > 1
+        for r in range(1, len(itemset))
+        for ante in combinations(itemset, r)
+    ]
+    ante = [a for a, _ in splits]
+    cons = [c for _, c in splits]
+    support = np.array([sup[a | c] for a, c in splits], dtype=float)
+    ante_sup = np.array([sup[a] for a in ante], dtype=float)
+    cons_sup = np.array([sup[c] for c in cons], dtype=float)
+    confidence = support / ante_sup
+    conviction = np.full_like(confidence, np.inf)
+    np.divide(1 - cons_sup, 1 - confidence, out=conviction, where=confidence < 1)
+    rules = pd.DataFrame({
+        "antecedents": ante,
+        "consequents": cons,
+        "support": support,
+        "confidence": confidence,
+        "lift": confidence / cons_sup,
+        "leverage": support - ante_sup * cons_sup,
+        "conviction": conviction,
+    })
+    rules = rules[rules[metric] >= min_threshold]
     # Sort for readability
     rules = rules.sort_values(["lift", "confidence", "support"], ascending=False)
     # Add human-readable columns
-    rules["antecedents_str"] = rules["antecedents"].apply(lambda s: ", ".join(sorted(list(s))))
-    rules["consequents_str"] = rules["consequents"].apply(lambda s: ", ".join(sorted(list(s))))
+    rules["antecedents_str"] = [_fmt(s) for s in rules["antecedents"].to_numpy()]
+    rules["consequents_str"] = [_fmt(s) for s in rules["consequents"].to_numpy()]
     cols = [
         "antecedents_str", "consequents_str", "support", "confidence", "lift", "leverage", "conviction",
     ]
     return rules[[*cols, "antecedents", "consequents"]]
 
 
+def _default_input() -> str:
+    # Fresh generator output (Parquet by default) wins over the bundled CSV
+    generated, bundled = "data/transactions.parquet", "data/transactions.csv"
+    return generated if Path(generated).exists() else bundled
+
+
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Run Market Basket Analysis")
-    p.add_argument("--input", default="data/transactions.csv")
+    p.add_argument("--input", default=_default_input(),
+                   help=".parquet/.csv transactions or .npz basket matrix "
+                        "(default: data/transactions.parquet if present, else data/transactions.csv)")
     p.add_argument("--outdir", default="outputs")
-    p.add_argument("--algo", choices=["apriori", "fpgrowth"], default="apriori")
+    p.add_argument("--cache_dir", default=".cache", help="where prepared basket matrices are cached")
+    p.add_argument("--no_cache", action="store_true", help="always rebuild the basket matrix")
+    p.add_argument("--algo", choices=["apriori", "fpgrowth"], default="fpgrowth")
     p.add_argument("--min_support", type=float, default=0.02)
     p.add_argument("--metric", choices=["support", "confidence", "lift", "leverage", "conviction"], default="lift")
     p.add_argument("--min_threshold", type=float, default=1.1, help="threshold for association_rules metric")
+    p.add_argument("--n_jobs", type=int, default=None,
+                   help="threads for apriori support counting (default / <= 0: all cores)")
     p.add_argument("--top_n", type=int, default=12, help="plot top-N single items by support")
     return p.parse_args()
 
 
 def main() -> None:
     args = parse_args()
+    if not Path(args.input).exists():
+        raise SystemExit(f"Input not found: {args.input} (run data/generate_transactions.py first)")
     outdir = ensure_outdir(args.outdir)
 
-    basket = load_and_prepare(args.input)
+    basket = load_and_prepare(args.input, cache_dir=None if args.no_cache else args.cache_dir)
 
-    # Single-item supports for plotting
+    # Single-item supports for plotting: exact integer counts / n_orders,
+    # computed the same way the miners do
+    n_orders = basket.shape[0]
+    counts = np.asarray(basket.sparse.to_coo().sum(axis=0)).ravel()
     item_support = (
-        basket.mean(axis=0)
+        pd.Series(counts / n_orders, index=basket.columns)
         .rename("support")
         .reset_index()
         .rename(columns={"index": "item"})
         .sort_values("support", ascending=False)
     )
 
-    fi = mine_frequent_itemsets(basket, args.algo, args.min_support)
+    # Apriori property: no frequent itemset contains an infrequent item, so
+    # those columns can be dropped before mining. Uses the exact test both
+    # miners apply to single items (integer count / n_orders >= min_support)
+    frequent = counts / n_orders >= args.min_support
+    fi = mine_frequent_itemsets(basket.loc[:, frequent], args.algo, args.min_support, n_jobs=args.n_jobs)
     rules = derive_rules(fi, metric=args.metric, min_threshold=args.min_threshold)
 
     # Save artifacts
@@ -2,14 +2,42 @@
 from __future__ import annotations
 from pathlib import Path
 import json
+import math
 import pandas as pd
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use("Agg", force=True)  # headless: never initialize a GUI backend
+from matplotlib.figure import Figure
+
+try:  # optional: vectorized CSV writer
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+
+try:  # optional: native JSON encoder
+    import orjson
+except ImportError:
+    orjson = None
 
 def _json_default(o):
     if isinstance(o, (set, frozenset)):
         return sorted(list(o))
     return str(o)  # last-resort fallback for other exotic types
 
+def _jsonable(o):
+    # Same document from both encoder paths: numpy values become Python ones
+    # and inf/nan become null (orjson's behaviour; the stdlib would write the
+    # non-standard Infinity/NaN)
+    if hasattr(o, "dtype") and hasattr(o, "tolist"):  # numpy scalars and arrays
+        o = o.tolist()
+    if isinstance(o, float):
+        return o if math.isfinite(o) else None
+    if isinstance(o, dict):
+        return {k: _jsonable(v) for k, v in o.items()}
+    if isinstance(o, (list, tuple)):
+        return [_jsonable(v) for v in o]
+    return o
+
 def ensure_outdir(path: str | Path) -> Path:
     out = Path(path)
     out.mkdir(parents=True, exist_ok=True)
@@ -18,26 +46,49 @@ def ensure_outdir(path: str | Path) -> Path:
 def save_table(df: pd.DataFrame, path: str | Path, index: bool = False) -> Path:
     path = Path(path)
     path.parent.mkdir(parents=True, exist_ok=True)
+    if pa is not None:
+        # Arrow can't convert frozenset (itemset) cells; write their str() as
+        # to_csv would, so every table goes through the same writer and quoting
+        # index=True: emit the index as leading column(s) like to_csv, not
+        # Arrow's trailing "__index_level_0__"
+        if index:
+            # unnamed levels get the blank header to_csv writes
+            df = df.reset_index(names=[n if n is not None else "" for n in df.index.names])
+        else:
+            df = df.copy(deep=False)
+        for col in df.columns:
+            if df[col].dtype == object and pd.api.types.infer_dtype(df[col]) not in ("string", "empty"):
+                df[col] = df[col].map(str, na_action="ignore")
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), path)
+        return path
     df.to_csv(path, index=index)
     return path
 
 def save_json(data: dict, path: str | Path) -> Path:
     path = Path(path)
     path.parent.mkdir(parents=True, exist_ok=True)
+    data = _jsonable(data)
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        path.write_bytes(orjson.dumps(data, default=_json_default, option=option))
+        return path
     with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, default=_json_default)
+        json.dump(data, f, indent=2, default=_json_default, allow_nan=False)
     return path
 
 def plot_top_items(item_support: pd.DataFrame, top_n: int, outdir: Path) -> Path:
-    fig, ax = plt.subplots(figsize=(8, 5))
+    # Figure without pyplot: no global figure registry, nothing to close
+    fig = Figure(figsize=(8, 5))
+    ax = fig.subplots()
     top = item_support.head(top_n)
     ax.bar(top["item"], top["support"])
     ax.set_title(f"Top {top_n} Items by Support")
     ax.set_xlabel("Item")
     ax.set_ylabel("Support")
-    plt.xticks(rotation=30, ha="right")
+    ax.tick_params(axis="x", labelrotation=30)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment("right")
     out_path = outdir / "fig_top_items.png"
     fig.tight_layout()
     fig.savefig(out_path, dpi=150)
-    plt.close(fig)
     return out_path